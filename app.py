@@ -15,12 +15,13 @@ import torch
 from insightface.app import FaceAnalysis
 from elasticsearch import Elasticsearch
 from typing import List
+from constants import ALLOWED_IMAGE_EXTENSIONS, is_allowed_ext
 
-logger = logging.getLogger()
+logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Only use StreamHandler for Lambda
-if not logger.handlers:
+# Lambda installs its own root handler; only add one when running elsewhere (e.g. under uvicorn)
+if not logger.handlers and not logging.getLogger().handlers:
     handler = logging.StreamHandler()
     handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
     logger.addHandler(handler)
@@ -47,9 +48,9 @@ try:
     s3_client = boto3.client("s3", region_name=AWS_REGION)
     # Test S3 connection
     s3_client.head_bucket(Bucket=S3_BUCKET)
-    logger.info(f"✅ S3 client initialized successfully for bucket: {S3_BUCKET}")
+    logger.info("✅ S3 client initialized successfully for bucket: %s", S3_BUCKET)
 except Exception as e:
-    logger.error(f"❌ Failed to initialize S3 client: {e}")
+    logger.error("❌ Failed to initialize S3 client: %s", e)
     s3_client = None
 
 # ─── Initialize Elasticsearch clients (will connect when first used) ──────────────
@@ -57,6 +58,36 @@ es_clients = []
 
 app = FastAPI(root_path="/prod")
 
+# ─── Answer health probes before routing ──────────────────────────────────────
+HEALTH_PATHS = frozenset({"/health", "/healthz", "/readyz"})
+HEALTH_BODY = json.dumps({"status": "healthy", "service": "face-detection-api"}).encode()
+HEALTH_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(HEALTH_BODY)).encode()),
+]
+
+
+class HealthInterceptor:
+    """Pure ASGI middleware that answers health probes without running routing or the endpoint."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            path = scope["path"]
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            if path in HEALTH_PATHS:
+                await send({"type": "http.response.start", "status": 200, "headers": HEALTH_HEADERS})
+                await send({"type": "http.response.body", "body": HEALTH_BODY if scope["method"] == "GET" else b""})
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(HealthInterceptor)
+
 # ─── Ensure temporary upload directory exists ─────────────────────────────────
 if not os.path.isdir(TEMP_UPLOAD_DIR):
     os.makedirs(TEMP_UPLOAD_DIR)
@@ -73,9 +104,9 @@ def get_es_clients():
                 # Test connection
                 client.info()
                 es_clients.append((client, host))
-                logger.info(f"✅ Connected to Elasticsearch at {host}")
+                logger.info("✅ Connected to Elasticsearch at %s", host)
             except Exception as e:
-                logger.error(f"❌ Failed to connect to Elasticsearch at {host}: {e}")
+                logger.error("❌ Failed to connect to Elasticsearch at %s: %s", host, e)
     return es_clients
 
 # ─── Create Elasticsearch index if needed ─────────────────────────────────────
@@ -107,13 +138,13 @@ def create_index_if_not_exists():
     for client, host in clients:
         try:
             if client.indices.exists(index=INDEX_NAME):
-                logger.info(f"ℹ️  Index '{INDEX_NAME}' already exists on {host}")
+                logger.info("ℹ️  Index '%s' already exists on %s", INDEX_NAME, host)
             else:
-                logger.info(f"🚀 Creating index '{INDEX_NAME}' on {host}")
+                logger.info("🚀 Creating index '%s' on %s", INDEX_NAME, host)
                 client.indices.create(index=INDEX_NAME, body=mapping_body)
-                logger.info(f"✅ Index '{INDEX_NAME}' created successfully on {host}")
+                logger.info("✅ Index '%s' created successfully on %s", INDEX_NAME, host)
         except Exception as e:
-            logger.error(f"❌ Failed to create index on {host}: {e}")
+            logger.error("❌ Failed to create index on %s: %s", host, e)
 
 # ─── Helper function to extract date from filename (if needed) ────────────────
 def extract_date_from_filename(filename: str) -> str:
@@ -135,7 +166,7 @@ def upload_image_to_s3(local_path: str) -> str:
     filename = Path(local_path).name
     file_ext = Path(filename).suffix.lower()
     
-    if file_ext not in [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp"]:
+    if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
         raise ValueError(f"Unsupported file extension: {file_ext}")
 
     unique_key = f"{uuid.uuid4().hex}_{filename}"
@@ -152,7 +183,7 @@ def upload_image_to_s3(local_path: str) -> str:
             ContentType=f"image/{file_ext.lstrip('.')}"
         )
     except Exception as e:
-        logger.error(f"⚠️ Failed to upload '{local_path}' to S3: {e}")
+        logger.error("⚠️ Failed to upload '%s' to S3: %s", local_path, e)
         raise
 
     public_url = f"https://{S3_BUCKET}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
@@ -168,7 +199,7 @@ def get_face_model():
         logger.info("🔄 Loading face detection model...")
         try:
             DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Using device: {DEVICE}")
+            logger.info("Using device: %s", DEVICE)
 
             face_app = FaceAnalysis(
                 name="antelopev2",
@@ -179,12 +210,12 @@ def get_face_model():
 
             logger.info("✅ antelopev2 model loaded successfully")
         except Exception as e:
-            logger.error(f"❌ Failed to load face model: {e}")
+            logger.error("❌ Failed to load face model: %s", e)
             raise
     return face_app
 
 # ─── Process images in the background (generate embeddings and index to ES) ────
-def process_images_and_generate_embeddings(image_paths: List[str]):
+def process_images_and_generate_embeddings(image_paths: List[str], job_id: str = None):
     """Process images to generate face embeddings and index them into Elasticsearch."""
     face_model = get_face_model()  # Get the model instance
     
@@ -202,7 +233,7 @@ def process_images_and_generate_embeddings(image_paths: List[str]):
             # Read image and run face detection
             img_bgr = cv2.imread(image_path)
             if img_bgr is None:
-                logger.warning(f"⚠️ Could not read image '{image_path}'. Skipping...")
+                logger.warning("⚠️ Could not read image '%s'. Skipping...", image_path)
                 continue
                 
             img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
@@ -210,7 +241,7 @@ def process_images_and_generate_embeddings(image_paths: List[str]):
             num_faces = len(faces)
             
             if not faces:
-                logger.info(f"ℹ️  No faces detected in '{image_path}'. Still uploaded to S3 → URL: {s3_url}")
+                logger.info("ℹ️  No faces detected in '%s'. Still uploaded to S3 → URL: %s", image_path, s3_url)
                 processed_count += 1
                 continue
             
@@ -231,16 +262,16 @@ def process_images_and_generate_embeddings(image_paths: List[str]):
                 for client, host in clients:
                     try:
                         client.index(index=INDEX_NAME, id=face_id, document=doc)
-                        logger.info(f"✅ Indexed face {idx+1} from '{Path(image_path).name}' into ES ({host})")
+                        logger.info("✅ Indexed face %s from '%s' into ES (%s)", idx+1, Path(image_path).name, host)
                     except Exception as e:
-                        logger.error(f"❌ Failed to index face {idx+1} from '{Path(image_path).name}' into ES ({host}): {e}")
+                        logger.error("❌ Failed to index face %s from '%s' into ES (%s): %s", idx+1, Path(image_path).name, host, e)
             
             total_faces += num_faces
             processed_count += 1
-            logger.info(f"✅ Processed '{Path(image_path).name}' → faces: {num_faces}, S3 URL: {s3_url}")
+            logger.info("✅ Processed '%s' → faces: %s, S3 URL: %s", Path(image_path).name, num_faces, s3_url)
             
         except Exception as e:
-            logger.error(f"⚠️ Error processing '{image_path}': {e}")
+            logger.error("⚠️ Error processing '%s': %s", image_path, e)
         finally:
             # Clean up temporary file
             try:
@@ -248,7 +279,7 @@ def process_images_and_generate_embeddings(image_paths: List[str]):
             except:
                 pass
     
-    logger.info(f"🏁 Bulk processing complete: {processed_count} images processed, {total_faces} faces indexed")
+    logger.info("🏁 Bulk processing complete (job %s): %s images processed, %s faces indexed", job_id, processed_count, total_faces)
 
 # ─── Existing endpoints ─────────────────────────────────────────────────────────
 
@@ -287,7 +318,7 @@ async def get_answer(question: str, context: str) -> dict:
 @app.post("/upload-images/")
 async def upload_images(background_tasks: BackgroundTasks, files: List[UploadFile] = File(...)):
     """Endpoint to upload multiple images and process them in the background."""
-    logger.info(f"⏳ Starting bulk image upload for {len(files)} files...")
+    logger.info("⏳ Starting bulk image upload for %s files...", len(files))
 
     if not files:
         return JSONResponse(
@@ -296,14 +327,12 @@ async def upload_images(background_tasks: BackgroundTasks, files: List[UploadFil
         )
 
     # Validate file extensions
-    valid_exts = (".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp")
     invalid_files = []
     
     # Temporarily store the images in the local directory
     image_paths = []
     for uploaded_file in files:
-        file_ext = Path(uploaded_file.filename).suffix.lower()
-        if file_ext not in valid_exts:
+        if not is_allowed_ext(uploaded_file.filename):
             invalid_files.append(uploaded_file.filename)
             continue
             
@@ -314,11 +343,11 @@ async def upload_images(background_tasks: BackgroundTasks, files: List[UploadFil
                 buffer.write(content)
             image_paths.append(image_path)
         except Exception as e:
-            logger.error(f"Failed to save uploaded file {uploaded_file.filename}: {e}")
+            logger.error("Failed to save uploaded file %s: %s", uploaded_file.filename, e)
             invalid_files.append(uploaded_file.filename)
     
     if invalid_files:
-        logger.warning(f"⚠️ Skipped {len(invalid_files)} invalid files: {invalid_files}")
+        logger.warning("⚠️ Skipped %s invalid files: %s", len(invalid_files), invalid_files)
     
     if not image_paths:
         return JSONResponse(
@@ -326,13 +355,16 @@ async def upload_images(background_tasks: BackgroundTasks, files: List[UploadFil
             content={"error": "No valid image files provided", "invalid_files": invalid_files}
         )
     
-    logger.info(f"✅ {len(image_paths)} valid images uploaded successfully to backend.")
+    logger.info("✅ %s valid images uploaded successfully to backend.", len(image_paths))
     
-    # Background task to process the images and generate embeddings
-    background_tasks.add_task(process_images_and_generate_embeddings, image_paths)
+    # Background task to process the images and generate embeddings; the caller gets
+    # a job id right away instead of waiting for processing to finish
+    job_id = uuid.uuid4().hex
+    background_tasks.add_task(process_images_and_generate_embeddings, image_paths, job_id)
 
     response_data = {
         "message": f"Images uploaded successfully! Processing {len(image_paths)} images for face detection and embedding generation.",
+        "job_id": job_id,
         "valid_files": len(image_paths),
         "total_files": len(files)
     }
@@ -341,12 +373,12 @@ async def upload_images(background_tasks: BackgroundTasks, files: List[UploadFil
         response_data["invalid_files"] = invalid_files
         response_data["skipped_files"] = len(invalid_files)
 
-    return JSONResponse(status_code=200, content=response_data)
+    return JSONResponse(status_code=202, content=response_data)
 
 # ─── Health check endpoint ─────────────────────────────────────────────────────
 @app.get("/health")
 async def health_check():
-    """Simple health check endpoint."""
+    """Simple health check endpoint (served by HealthInterceptor; kept for the OpenAPI docs)."""
     return {"status": "healthy", "service": "face-detection-api"}
 
 # ─── Elasticsearch connection test endpoint ─────────────────────────────────────
@@ -366,12 +398,16 @@ async def test_elasticsearch():
 
 
 def lambda_handler(event, context):
-    logger.info(json.dumps(event))
+    # Events and responses can be large; only serialize them when INFO is enabled
+    log_payloads = logger.isEnabledFor(logging.INFO)
+    if log_payloads:
+        logger.info("%s", json.dumps(event))
 
     asgi_handler = Mangum(app)
     response = asgi_handler(
         event, context
     )  # Call the instance with the event arguments
 
-    logger.info(json.dumps(response))
+    if log_payloads:
+        logger.info("%s", json.dumps(response))
     return response
\ No newline at end of file
@@ -1,47 +1,140 @@
 # Application Constants
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
 
-# Load environment variables
-load_dotenv()
+
+@dataclass(frozen=True)
+class Config:
+    """Environment-derived configuration, resolved once per process/container."""
+
+    # Deployment Configuration
+    environment: str
+
+    # AWS Configuration
+    aws_region: str
+    s3_bucket_name: str
+    s3_upload_path: str
+
+    # Elasticsearch Configuration
+    es_hosts: Tuple[str, ...]
+    index_name: str
+
+    # FastAPI Configuration
+    fastapi_host: str
+    fastapi_port: int
+
+    # Model Configuration
+    face_detection_threshold: float
+    face_detection_size: int
+
+    # EC2 Configuration
+    test_instance_id: Optional[str]
+    prod_instance_id: Optional[str]
+    ec2_instance_id: str
+    ready_queue_url: Optional[str]
+
+    # Logging Configuration
+    log_level: str
+
+    # Performance Configuration
+    max_concurrent_uploads: int
+    background_task_timeout: int
+
+    # Auto-shutdown Configuration
+    auto_shutdown_idle_time: int
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config, preferring values baked in at deploy time."""
+    try:
+        from constants_frozen import FROZEN_CONFIG
+    except ImportError:
+        return load_config_from_env()
+    return Config(**FROZEN_CONFIG)
+
+
+def load_config_from_env() -> Config:
+    """Build a Config from the process environment (and .env outside Lambda)."""
+    # Lambda injects the environment itself; skip the .env file search there
+    if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    prod_instance_id = os.getenv("PROD_INSTANCE_ID")
+    return Config(
+        environment=os.getenv("ENVIRONMENT", "test"),  # Selects the controller profile in handler.py
+        aws_region=os.getenv("AWS_REGION", "ap-south-1"),
+        s3_bucket_name=os.getenv("S3_BUCKET_NAME", "divinepic-test"),
+        s3_upload_path=os.getenv("S3_UPLOAD_PATH", "upload_with_embed"),
+        es_hosts=(
+            os.getenv("ES_HOSTS1", "http://3.6.116.114:9200"),
+            # os.getenv("ES_HOSTS2", ""),  # Add second host if needed
+        ),
+        index_name=os.getenv("INDEX_NAME", "face_embeddings"),
+        fastapi_host=os.getenv("FASTAPI_HOST", "0.0.0.0"),
+        fastapi_port=int(os.getenv("FASTAPI_PORT", "8000")),
+        face_detection_threshold=float(os.getenv("FACE_DETECTION_THRESHOLD", "0.35")),
+        face_detection_size=int(os.getenv("FACE_DETECTION_SIZE", "640")),
+        test_instance_id=os.getenv("TEST_INSTANCE_ID"),
+        prod_instance_id=prod_instance_id,
+        ec2_instance_id=os.getenv("EC2_INSTANCE_ID", prod_instance_id or "i-08ce9b2d7eccf6d26"),  # Backward compatibility
+        ready_queue_url=os.getenv("READY_QUEUE_URL"),  # SQS queue subscribed to the instance-ready SNS topic
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        max_concurrent_uploads=int(os.getenv("MAX_CONCURRENT_UPLOADS", "5")),
+        background_task_timeout=int(os.getenv("BACKGROUND_TASK_TIMEOUT", "1800")),  # 30 minutes
+        auto_shutdown_idle_time=int(os.getenv("AUTO_SHUTDOWN_IDLE_TIME", "3600")),  # 1 hour
+    )
+
+
+CONFIG = get_config()
+
+# Deployment Configuration
+ENVIRONMENT = CONFIG.environment
 
 # AWS Configuration
-AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
-S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "divinepic-test")
-S3_UPLOAD_PATH = os.getenv("S3_UPLOAD_PATH", "upload_with_embed")
+AWS_REGION = CONFIG.aws_region
+S3_BUCKET_NAME = CONFIG.s3_bucket_name
+S3_UPLOAD_PATH = CONFIG.s3_upload_path
 
 # Elasticsearch Configuration
-ES_HOSTS = [
-    os.getenv("ES_HOSTS1", "http://3.6.116.114:9200"),
-    # os.getenv("ES_HOSTS2", ""),  # Add second host if needed
-]
-INDEX_NAME = os.getenv("INDEX_NAME", "face_embeddings")
+ES_HOSTS = list(CONFIG.es_hosts)
+INDEX_NAME = CONFIG.index_name
 
 # FastAPI Configuration
-FASTAPI_HOST = os.getenv("FASTAPI_HOST", "0.0.0.0")
-FASTAPI_PORT = int(os.getenv("FASTAPI_PORT", "8000"))
+FASTAPI_HOST = CONFIG.fastapi_host
+FASTAPI_PORT = CONFIG.fastapi_port
 
 # Model Configuration
-FACE_DETECTION_THRESHOLD = float(os.getenv("FACE_DETECTION_THRESHOLD", "0.35"))
-FACE_DETECTION_SIZE = int(os.getenv("FACE_DETECTION_SIZE", "640"))
+FACE_DETECTION_THRESHOLD = CONFIG.face_detection_threshold
+FACE_DETECTION_SIZE = CONFIG.face_detection_size
 
 # File Upload Configuration
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
-ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp"}
+ALLOWED_IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp"})
 TEMP_UPLOAD_DIR = "/tmp/uploads"
 
+
+def is_allowed_ext(name: str) -> bool:
+    """Check a file name against ALLOWED_IMAGE_EXTENSIONS (case-insensitive)."""
+    dot, _, ext = name.rpartition(".")
+    return bool(dot) and f".{ext.lower()}" in ALLOWED_IMAGE_EXTENSIONS
+
 # EC2 Configuration
-TEST_INSTANCE_ID = os.getenv("TEST_INSTANCE_ID")
-PROD_INSTANCE_ID = os.getenv("PROD_INSTANCE_ID")
-EC2_INSTANCE_ID = os.getenv("EC2_INSTANCE_ID", PROD_INSTANCE_ID or "i-08ce9b2d7eccf6d26")  # Backward compatibility
+TEST_INSTANCE_ID = CONFIG.test_instance_id
+PROD_INSTANCE_ID = CONFIG.prod_instance_id
+EC2_INSTANCE_ID = CONFIG.ec2_instance_id
 MAX_INSTANCE_WAIT_TIME = 300  # 5 minutes
+READY_QUEUE_URL = CONFIG.ready_queue_url
 
 # Logging Configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVEL = CONFIG.log_level
 
 # Performance Configuration
-MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "5"))
-BACKGROUND_TASK_TIMEOUT = int(os.getenv("BACKGROUND_TASK_TIMEOUT", "1800"))  # 30 minutes
+MAX_CONCURRENT_UPLOADS = CONFIG.max_concurrent_uploads
+BACKGROUND_TASK_TIMEOUT = CONFIG.background_task_timeout
 
 # Auto-shutdown Configuration
-AUTO_SHUTDOWN_IDLE_TIME = int(os.getenv("AUTO_SHUTDOWN_IDLE_TIME", "3600"))  # 1 hour
+AUTO_SHUTDOWN_IDLE_TIME = CONFIG.auto_shutdown_idle_time
@@ -9,6 +9,9 @@ S3_BUCKET="divinepic-prod"
 LAMBDA_FUNCTION_NAME="divinepic-prod-controller"
 PROD_INSTANCE_ID="i-08ce9b2d7eccf6d26"  # Your actual production GPU instance ID
 ENVIRONMENT="production"
+# Optional instance-ready notification; per environment so the production package never reads the test queue
+READY_TOPIC_ARN="${PROD_READY_TOPIC_ARN:-}"  # SNS topic the instance announces readiness on
+READY_QUEUE_URL="${PROD_READY_QUEUE_URL:-}"  # SQS queue subscribed to that topic, polled by the Lambda
 
 # Colors for output
 RED='\033[0;31m'
@@ -116,19 +119,16 @@ setup_prod_lambda_function() {
     
     # Create deployment package
     mkdir -p lambda-prod-package
-    cp lambda-prod.py lambda-prod-package/lambda.py
+    cp handler.py lambda-prod-package/
+    cp constants.py lambda-prod-package/
+    cp -r handlers lambda-prod-package/
+    # Bake configuration into the package so cold starts skip environment parsing
+    ENVIRONMENT=production PROD_INSTANCE_ID="$PROD_INSTANCE_ID" AWS_REGION="$AWS_REGION" READY_QUEUE_URL="$READY_QUEUE_URL" python3 scripts/gen_constants.py lambda-prod-package/constants_frozen.py
     cd lambda-prod-package
     
-    # Create environment variables file
-    cat > lambda_env.py << EOF
-import os
-os.environ['PROD_INSTANCE_ID'] = '$PROD_INSTANCE_ID'
-os.environ['AWS_REGION'] = '$AWS_REGION'
-os.environ['ENVIRONMENT'] = 'production'
-EOF
-    
     # Install dependencies
     pip install requests boto3 -t .
+    pip install orjson -t . --platform manylinux2014_x86_64 --python-version 3.9 --only-binary=:all: || echo "orjson unavailable, falling back to json"
     
     # Create zip file
     zip -r ../lambda-prod-deployment.zip .
@@ -142,11 +142,17 @@ EOF
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --zip-file fileb://lambda-prod-deployment.zip \
             --region "$AWS_REGION"
+
+        # A configuration update is rejected while the code update is still in progress
+        aws lambda wait function-updated \
+            --function-name "$LAMBDA_FUNCTION_NAME" \
+            --region "$AWS_REGION"
         
-        # Update environment variables
+        # Configuration is baked into constants_frozen.py; clear variables older deploys set so they can't mislead
         aws lambda update-function-configuration \
             --function-name "$LAMBDA_FUNCTION_NAME" \
-            --environment Variables="{PROD_INSTANCE_ID=$PROD_INSTANCE_ID,ENVIRONMENT=production}" \
+            --handler handler.lambda_handler \
+            --environment "Variables={}" \
             --region "$AWS_REGION"
     else
         echo -e "${YELLOW}Creating new PRODUCTION Lambda function${NC}"
@@ -158,21 +164,66 @@ EOF
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --runtime python3.9 \
             --role "arn:aws:iam::$(aws sts get-caller-identity --query Account --output text):role/divinepic-prod-lambda-role" \
-            --handler lambda.lambda_handler \
+            --handler handler.lambda_handler \
             --zip-file fileb://lambda-prod-deployment.zip \
             --timeout 900 \
             --memory-size 256 \
-            --environment Variables="{PROD_INSTANCE_ID=$PROD_INSTANCE_ID,ENVIRONMENT=production}" \
             --region "$AWS_REGION"
             
         # Add dead letter queue for production
         create_dlq_for_prod_lambda
     fi
     
+    grant_prod_ready_queue_access
+    
     rm lambda-prod-deployment.zip
     echo -e "${GREEN}✅ PRODUCTION Lambda function setup complete${NC}"
 }
 
+# Function to let the PRODUCTION Lambda consume the instance-ready queue
+grant_prod_ready_queue_access() {
+    if [ -z "$READY_QUEUE_URL" ]; then
+        return 0
+    fi
+    echo -e "${YELLOW}🔐 Granting PRODUCTION Lambda access to the ready queue${NC}"
+    
+    QUEUE_ARN=$(aws sqs get-queue-attributes \
+        --queue-url "$READY_QUEUE_URL" \
+        --attribute-names QueueArn \
+        --region "$AWS_REGION" \
+        --query 'Attributes.QueueArn' --output text)
+    # Use whichever role the function runs as, including ones this script did not create
+    ROLE_ARN=$(aws lambda get-function-configuration \
+        --function-name "$LAMBDA_FUNCTION_NAME" \
+        --region "$AWS_REGION" \
+        --query 'Role' --output text)
+    
+    cat > ready-queue-policy-prod.json << EOF
+{
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": [
+                "sqs:ReceiveMessage",
+                "sqs:DeleteMessage",
+                "sqs:ChangeMessageVisibility"
+            ],
+            "Resource": "$QUEUE_ARN"
+        }
+    ]
+}
+EOF
+    
+    aws iam put-role-policy \
+        --role-name "${ROLE_ARN##*/}" \
+        --policy-name divinepic-ready-queue \
+        --policy-document file://ready-queue-policy-prod.json
+    
+    rm ready-queue-policy-prod.json
+    echo -e "${GREEN}✅ PRODUCTION Lambda can read the ready queue${NC}"
+}
+
 # Function to create IAM role for PRODUCTION Lambda
 create_prod_lambda_role() {
     echo -e "${YELLOW}🔐 Creating IAM role for PRODUCTION Lambda${NC}"
@@ -261,6 +312,11 @@ create_dlq_for_prod_lambda() {
             --region "$AWS_REGION" \
             --query 'Attributes.QueueArn' --output text)
         
+        # A newly created function rejects configuration updates until it is active
+        aws lambda wait function-active-v2 \
+            --function-name "$LAMBDA_FUNCTION_NAME" \
+            --region "$AWS_REGION"
+        
         # Update Lambda with DLQ
         aws lambda update-function-configuration \
             --function-name "$LAMBDA_FUNCTION_NAME" \
@@ -287,6 +343,7 @@ aws s3 cp s3://$S3_BUCKET/scripts/startup-script-prod.sh /home/ec2-user/startup-
 chmod +x /home/ec2-user/startup-script-prod.sh
 # Update the instance ID in the script
 sed -i 's/i-08ce9b2d7eccf6d26/$PROD_INSTANCE_ID/g' /home/ec2-user/startup-script-prod.sh
+sed -i 's|^READY_TOPIC_ARN=.*|READY_TOPIC_ARN="$READY_TOPIC_ARN"|' /home/ec2-user/startup-script-prod.sh
 /home/ec2-user/startup-script-prod.sh >> /var/log/startup-prod.log 2>&1
 EOF
     
@@ -294,6 +351,9 @@ EOF
     echo -e "${YELLOW}⚠️  Remember to:${NC}"
     echo "1. Update your PRODUCTION EC2 instance user data with the contents of user-data-prod.sh"
     echo "2. Ensure your PRODUCTION instance has an IAM role with S3 and EC2 permissions"
+    if [ -n "$READY_TOPIC_ARN" ]; then
+        echo "   That role also needs sns:Publish on $READY_TOPIC_ARN for the ready notifier"
+    fi
     echo "3. Use a GPU instance type (p3.2xlarge, g4dn.xlarge, etc.)"
     echo "4. Install NVIDIA drivers and Docker GPU runtime"
     echo "5. Update PROD_INSTANCE_ID variable in this script with your actual instance ID"
@@ -13,6 +13,9 @@ S3_BUCKET="${TEST_S3_BUCKET:-divinepic-test}"
 LAMBDA_FUNCTION_NAME="${TEST_LAMBDA_FUNCTION:-divinepic-test-controller}"
 TEST_INSTANCE_ID="${TEST_INSTANCE_ID}"  # Must be set in .env
 ENVIRONMENT="${ENVIRONMENT:-test}"
+# Optional instance-ready notification; per environment so the test package never reads the production queue
+READY_TOPIC_ARN="${TEST_READY_TOPIC_ARN:-}"  # SNS topic the instance announces readiness on
+READY_QUEUE_URL="${TEST_READY_QUEUE_URL:-}"  # SQS queue subscribed to that topic, polled by the Lambda
 
 # Validate required variables
 if [ -z "$TEST_INSTANCE_ID" ]; then
@@ -105,19 +108,16 @@ setup_test_lambda_function() {
     
     # Create deployment package
     mkdir -p lambda-test-package
-    cp lambda-test.py lambda-test-package/lambda.py
+    cp handler.py lambda-test-package/
+    cp constants.py lambda-test-package/
+    cp -r handlers lambda-test-package/
+    # Bake configuration into the package so cold starts skip environment parsing
+    ENVIRONMENT=test TEST_INSTANCE_ID="$TEST_INSTANCE_ID" AWS_REGION="$AWS_REGION" READY_QUEUE_URL="$READY_QUEUE_URL" python3 scripts/gen_constants.py lambda-test-package/constants_frozen.py
     cd lambda-test-package
     
-    # Create environment variables file
-    cat > lambda_env.py << EOF
-import os
-os.environ['TEST_INSTANCE_ID'] = '$TEST_INSTANCE_ID'
-os.environ['AWS_REGION'] = '$AWS_REGION'
-os.environ['ENVIRONMENT'] = 'test'
-EOF
-    
     # Install dependencies
     pip install requests boto3 -t .
+    pip install orjson -t . --platform manylinux2014_x86_64 --python-version 3.9 --only-binary=:all: || echo "orjson unavailable, falling back to json"
     
     # Create zip file
     zip -r ../lambda-test-deployment.zip .
@@ -131,11 +131,17 @@ EOF
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --zip-file fileb://lambda-test-deployment.zip \
             --region "$AWS_REGION"
+
+        # A configuration update is rejected while the code update is still in progress
+        aws lambda wait function-updated \
+            --function-name "$LAMBDA_FUNCTION_NAME" \
+            --region "$AWS_REGION"
         
-        # Update environment variables
+        # Configuration is baked into constants_frozen.py; clear variables older deploys set so they can't mislead
         aws lambda update-function-configuration \
             --function-name "$LAMBDA_FUNCTION_NAME" \
-            --environment Variables="{TEST_INSTANCE_ID=$TEST_INSTANCE_ID,ENVIRONMENT=test}" \
+            --handler handler.lambda_handler \
+            --environment "Variables={}" \
             --region "$AWS_REGION"
     else
         echo -e "${YELLOW}Creating new TEST Lambda function${NC}"
@@ -147,18 +153,63 @@ EOF
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --runtime python3.9 \
             --role "arn:aws:iam::$(aws sts get-caller-identity --query Account --output text):role/divinepic-test-lambda-role" \
-            --handler lambda.lambda_handler \
+            --handler handler.lambda_handler \
             --zip-file fileb://lambda-test-deployment.zip \
             --timeout 900 \
             --memory-size 128 \
-            --environment Variables="{TEST_INSTANCE_ID=$TEST_INSTANCE_ID,ENVIRONMENT=test}" \
             --region "$AWS_REGION"
     fi
     
+    grant_test_ready_queue_access
+    
     rm lambda-test-deployment.zip
     echo -e "${GREEN}✅ TEST Lambda function setup complete${NC}"
 }
 
+# Function to let the TEST Lambda consume the instance-ready queue
+grant_test_ready_queue_access() {
+    if [ -z "$READY_QUEUE_URL" ]; then
+        return 0
+    fi
+    echo -e "${YELLOW}🔐 Granting TEST Lambda access to the ready queue${NC}"
+    
+    QUEUE_ARN=$(aws sqs get-queue-attributes \
+        --queue-url "$READY_QUEUE_URL" \
+        --attribute-names QueueArn \
+        --region "$AWS_REGION" \
+        --query 'Attributes.QueueArn' --output text)
+    # Use whichever role the function runs as, including ones this script did not create
+    ROLE_ARN=$(aws lambda get-function-configuration \
+        --function-name "$LAMBDA_FUNCTION_NAME" \
+        --region "$AWS_REGION" \
+        --query 'Role' --output text)
+    
+    cat > ready-queue-policy-test.json << EOF
+{
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": [
+                "sqs:ReceiveMessage",
+                "sqs:DeleteMessage",
+                "sqs:ChangeMessageVisibility"
+            ],
+            "Resource": "$QUEUE_ARN"
+        }
+    ]
+}
+EOF
+    
+    aws iam put-role-policy \
+        --role-name "${ROLE_ARN##*/}" \
+        --policy-name divinepic-ready-queue \
+        --policy-document file://ready-queue-policy-test.json
+    
+    rm ready-queue-policy-test.json
+    echo -e "${GREEN}✅ TEST Lambda can read the ready queue${NC}"
+}
+
 # Function to create IAM role for TEST Lambda
 create_test_lambda_role() {
     echo -e "${YELLOW}🔐 Creating IAM role for TEST Lambda${NC}"
@@ -237,6 +288,28 @@ chown ubuntu:ubuntu /home/ubuntu/startup-script-test.sh
 
 # Update the instance ID in the script
 sed -i 's/i-test-cpu-instance/$TEST_INSTANCE_ID/g' /home/ubuntu/startup-script-test.sh
+sed -i 's|^READY_TOPIC_ARN=.*|READY_TOPIC_ARN="$READY_TOPIC_ARN"|' /home/ubuntu/startup-script-test.sh
+
+# The startup script targets Amazon Linux (yum, Docker); on this Ubuntu image the app is
+# deployed over SSM instead, so only its ready notifier is installed here
+cat > /home/ubuntu/notify-ready-test.sh << 'NOTIFY'
+#!/bin/bash
+# Publish this instance's id to READY_TOPIC_ARN once FastAPI answers /health
+READY_TOPIC_ARN="$READY_TOPIC_ARN"
+[ -z "\$READY_TOPIC_ARN" ] && exit 0
+INSTANCE_ID=\$(curl -s http://169.254.169.254/latest/meta-data/instance-id)
+for i in {1..60}; do
+    if curl -sf http://localhost:8000/health > /dev/null; then
+        aws sns publish --topic-arn "\$READY_TOPIC_ARN" --message "\$INSTANCE_ID" --region $AWS_REGION
+        exit 0
+    fi
+    sleep 5
+done
+NOTIFY
+chmod +x /home/ubuntu/notify-ready-test.sh
+# User Data only runs on first launch, so the notifier is also registered as an @reboot job
+(crontab -l 2>/dev/null | grep -v notify-ready-test.sh; echo "@reboot /home/ubuntu/notify-ready-test.sh >> /var/log/notify-ready-test.log 2>&1") | crontab -
+nohup /home/ubuntu/notify-ready-test.sh >> /var/log/notify-ready-test.log 2>&1 &
 
 # Log startup process
 echo "TEST Instance setup completed at \$(date)" >> /var/log/startup-test.log
@@ -285,6 +358,27 @@ EOF
         --role-name DivinePic-TEST-EC2-Role \
         --policy-arn arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess
     
+    # The ready notifier publishes the instance id to the topic
+    if [ -n "$READY_TOPIC_ARN" ]; then
+        cat > ready-topic-policy-test.json << EOF
+{
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": "sns:Publish",
+            "Resource": "$READY_TOPIC_ARN"
+        }
+    ]
+}
+EOF
+        aws iam put-role-policy \
+            --role-name DivinePic-TEST-EC2-Role \
+            --policy-name divinepic-ready-topic \
+            --policy-document file://ready-topic-policy-test.json
+        rm ready-topic-policy-test.json
+    fi
+    
     # Create instance profile
     aws iam create-instance-profile \
         --instance-profile-name DivinePic-TEST-EC2-Profile || true
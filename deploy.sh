@@ -94,7 +94,11 @@ setup_lambda_function() {
     
     # Create deployment package
     mkdir -p lambda-package
-    cp lambda.py lambda-package/
+    cp handler.py constants.py lambda-package/
+    cp -r handlers lambda-package/
+    # Bake configuration into the package so cold starts skip environment parsing
+    # This setup wires no ready notifier or queue permissions, so keep a READY_QUEUE_URL in .env out of it
+    ENVIRONMENT=production PROD_INSTANCE_ID="$EC2_INSTANCE_ID" AWS_REGION="$AWS_REGION" READY_QUEUE_URL="" python3 scripts/gen_constants.py lambda-package/constants_frozen.py
     cd lambda-package
     
     # Install dependencies
@@ -112,6 +116,18 @@ setup_lambda_function() {
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --zip-file fileb://lambda-deployment.zip \
             --region "$AWS_REGION"
+
+        # A configuration update is rejected while the code update is still in progress
+        aws lambda wait function-updated \
+            --function-name "$LAMBDA_FUNCTION_NAME" \
+            --region "$AWS_REGION"
+
+        # Configuration is baked into constants_frozen.py; clear variables older deploys set so they can't mislead
+        aws lambda update-function-configuration \
+            --function-name "$LAMBDA_FUNCTION_NAME" \
+            --handler handler.lambda_handler \
+            --environment "Variables={}" \
+            --region "$AWS_REGION"
     else
         echo -e "${YELLOW}Creating new Lambda function${NC}"
         
@@ -122,7 +138,7 @@ setup_lambda_function() {
             --function-name "$LAMBDA_FUNCTION_NAME" \
             --runtime python3.9 \
             --role "arn:aws:iam::$(aws sts get-caller-identity --query Account --output text):role/divinepic-lambda-role" \
-            --handler lambda.lambda_handler \
+            --handler handler.lambda_handler \
             --zip-file fileb://lambda-deployment.zip \
             --timeout 900 \
             --memory-size 128 \
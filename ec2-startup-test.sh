@@ -11,6 +11,7 @@ TEST_INSTANCE_ID="${TEST_INSTANCE_ID:-i-test-cpu-instance}"  # Fallback if not s
 ENVIRONMENT="${ENVIRONMENT:-test}"
 AWS_REGION="${AWS_REGION:-ap-south-1}"
 S3_BUCKET="${TEST_S3_BUCKET:-divinepic-test}"
+READY_TOPIC_ARN="${READY_TOPIC_ARN:-}"  # Optional; filled in by the deploy script's user data
 
 # Logging
 LOG_FILE="/var/log/startup-script-test.log"
@@ -169,5 +170,32 @@ chmod +x /home/ec2-user/monitor-test.sh
 echo "$(date): TEST EC2 startup script completed successfully!"
 echo "$(date): TEST Environment is ready for development and testing"
 
+# Announce readiness to the Lambda controller on every boot (optional)
+# User Data only runs on first launch, so the notifier is also registered as an @reboot job
+# Cron runs the notifier without this script's variables, so persist the ones it needs
+cat > /home/ec2-user/notify-ready-test.env << EOF
+READY_TOPIC_ARN="$READY_TOPIC_ARN"
+AWS_REGION="$AWS_REGION"
+EOF
+
+cat > /home/ec2-user/notify-ready-test.sh << 'EOF'
+#!/bin/bash
+# Publish this instance's id to READY_TOPIC_ARN once FastAPI answers /health
+source /home/ec2-user/notify-ready-test.env 2>/dev/null || true
+[ -z "$READY_TOPIC_ARN" ] && exit 0
+INSTANCE_ID=$(curl -s http://169.254.169.254/latest/meta-data/instance-id)
+for i in {1..60}; do
+    if curl -sf http://localhost:8000/health > /dev/null; then
+        aws sns publish --topic-arn "$READY_TOPIC_ARN" --message "$INSTANCE_ID" --region "${AWS_REGION:-ap-south-1}"
+        exit 0
+    fi
+    sleep 5
+done
+EOF
+
+chmod +x /home/ec2-user/notify-ready-test.sh
+(crontab -l 2>/dev/null | grep -v notify-ready-test.sh; echo "@reboot /home/ec2-user/notify-ready-test.sh >> /var/log/notify-ready-test.log 2>&1") | crontab -
+nohup /home/ec2-user/notify-ready-test.sh &
+
 # Send success notification (optional)
 # aws sns publish --topic-arn "arn:aws:sns:ap-south-1:YOUR_ACCOUNT:test-instance-ready" --message "TEST GPU instance is ready" --region ap-south-1 
\ No newline at end of file
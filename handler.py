@@ -0,0 +1,60 @@
+import logging
+
+from constants import CONFIG
+from handlers.core import InstanceController
+
+# Per-environment controller settings; both Lambda functions ship this same module
+# and pick their profile from the ENVIRONMENT variable
+PROFILES = {
+    'production': {
+        'instance_id': CONFIG.prod_instance_id,
+        'instance_id_var': 'PROD_INSTANCE_ID',
+        'instance_type': 'GPU',
+        'default_action': 'start_and_process',
+        'actions': ('start', 'stop', 'start_and_process', 'scale_up', 'scale_down'),
+        'health_timeout': 5.0,  # Read timeout for /health; connecting is capped separately
+        'check_gpu': True,
+        'extra_payload': {'priority': 'high'},  # Production priority
+    },
+    'test': {
+        'instance_id': CONFIG.test_instance_id,
+        'instance_id_var': 'TEST_INSTANCE_ID',
+        'instance_type': 'CPU',
+        'default_action': 'deploy_and_start',
+        'actions': ('start', 'stop', 'start_and_process', 'deploy_and_start'),
+        'health_timeout': 5.0,
+        's3_bucket': 'divinepic-test',
+        'uvicorn_workers': 1,  # Each worker loads its own model; raise only on instances with memory to spare
+    },
+}
+
+_profile = dict(PROFILES.get(CONFIG.environment) or {})
+if not _profile:
+    raise ValueError(f"ENVIRONMENT must be one of {sorted(PROFILES)}, got {CONFIG.environment!r}")
+
+_instance_id_var = _profile.pop('instance_id_var')
+if not _profile['instance_id']:
+    raise ValueError(f"{_instance_id_var} environment variable is required")
+
+if CONFIG.environment == 'production':
+    # Never let a failing log handler surface as an exception in production; test keeps them visible
+    logging.raiseExceptions = False
+
+_controller = InstanceController(environment=CONFIG.environment, **_profile)
+
+lambda_handler = _controller.handle
+
+# Legacy function names for backward compatibility - use lambda_handler with action='start'/'stop' instead
+_LEGACY_ALIASES = {
+    'gpu_inst_start': 'start',
+    'gpu_inst_shut': 'stop',
+    'test_inst_start': 'start',
+    'test_inst_stop': 'stop',
+}
+
+
+def __getattr__(name):
+    """Resolve the legacy names only when something references them (PEP 562)"""
+    if name in _LEGACY_ALIASES:
+        return getattr(_controller, _LEGACY_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
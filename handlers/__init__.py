@@ -0,0 +1,3 @@
+from handlers.core import InstanceController
+
+__all__ = ["InstanceController"]
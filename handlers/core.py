@@ -0,0 +1,803 @@
+import json
+import socket
+import textwrap
+import time
+from botocore.exceptions import BotoCoreError, ClientError, WaiterError
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from constants import CONFIG
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+# Skip thread/process lookups and caller frame inspection on every record
+logging.logThreads = False
+logging.logProcesses = False
+logging._srcfile = None
+
+
+def _init_logging():
+    """Configure the module logger once, without touching the root logger"""
+    logger.setLevel(CONFIG.log_level)
+    # Lambda installs its own root handler; only add one when running elsewhere,
+    # and never twice if this module is re-imported
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+
+
+_init_logging()
+
+# Shared configuration
+REGION = CONFIG.aws_region
+MAX_WAIT_TIME = 300  # 5 minutes max wait for instance to start
+WAITER_DELAY = 5  # Seconds between EC2 waiter polls
+HEALTH_CHECK_ATTEMPTS = 20
+HEALTH_CHECK_MAX_DELAY = 10  # Cap for exponential backoff between health probes
+HEALTH_CACHE_TTL = 30  # Seconds a successful health probe is reused
+TCP_PROBE_TIMEOUT = 2  # Seconds for the connect-only probe that precedes GET /health
+HTTP_CONNECT_TIMEOUT = 2.0  # Connect half of every (connect, read) timeout; an unreachable host fails fast
+GPU_STATUS_READ_TIMEOUT = 10.0
+INSTANCE_CACHE_TTL = 600  # Seconds a known-good instance IP is trusted on warm invocations
+READY_POLL_WAIT = 5  # SQS receive wait per round, between /health probes
+SSM_COMMAND_TIMEOUT = 300  # Seconds the deploy command may run on the instance
+DEPLOY_WAIT_TIME = 780  # One budget for start, deploy and health check in deploy_and_start; under the 900s Lambda timeout
+SSM_POLL_MAX_DELAY = 15  # Cap for the Fibonacci backoff between command status polls
+SSM_TERMINAL_STATUSES = frozenset({'Success', 'Failed', 'Cancelled', 'TimedOut'})
+FASTAPI_PORT = CONFIG.fastapi_port
+PROCESSING_SUBMIT_TIMEOUT = 10  # Seconds to wait for FastAPI to accept a job; processing continues in the background
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# FastAPI URLs with only the instance IP left to fill in (%-formatting is cheaper than an f-string per call)
+_BASE_URL = "http://%s:" + str(FASTAPI_PORT)
+HEALTH_URL_TMPL = _BASE_URL + "/health"
+GPU_STATUS_URL_TMPL = _BASE_URL + "/gpu-status"
+UPLOAD_URL_TMPL = _BASE_URL + "/upload-images/"
+DOCS_URL_TMPL = _BASE_URL + "/docs"
+
+# boto3 and requests are imported on first use: actions such as scale_up/scale_down
+# never touch EC2 or HTTP, so cold starts for them skip those imports entirely.
+# The cached accessors keep one client/session per container across warm invocations.
+@lru_cache(maxsize=None)
+def _boto_config():
+    """Standard-mode retries with a small attempt budget; keepalive and a pool sized
+    for the concurrent probes let warm containers reuse their AWS connections"""
+    from botocore.config import Config
+    return Config(
+        region_name=REGION,
+        retries={'mode': 'standard', 'max_attempts': 3},
+        tcp_keepalive=True,
+        max_pool_connections=10,
+        connect_timeout=3,
+        read_timeout=10,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_ec2():
+    """EC2 client, created on first use"""
+    import boto3
+    return boto3.client('ec2', config=_boto_config())
+
+
+@lru_cache(maxsize=None)
+def _get_ssm():
+    """SSM client, created on first use"""
+    import boto3
+    return boto3.client('ssm', config=_boto_config())
+
+
+@lru_cache(maxsize=None)
+def _get_sqs():
+    """SQS client for the ready queue; read timeout must outlast each receive wait"""
+    import boto3
+    from botocore.config import Config
+    return boto3.client('sqs', config=_boto_config().merge(Config(read_timeout=READY_POLL_WAIT + 5)))
+
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """requests Session reusing keep-alive connections to the FastAPI instance"""
+    # uvicorn serves plain-text HTTP/1.1, so an HTTP/2 client (httpx[http2]) would gain nothing here:
+    # h2 is only negotiated over TLS, and the extra dependency would grow the package
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    # Pool sized above _PROBE_POOL so concurrent probes never discard connections;
+    # a short retry budget absorbs a dropped keep-alive connection (POSTs are not re-sent)
+    session.mount("http://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ))
+    return session
+
+
+# Instance id -> {'ip': public IP, 'ts': monotonic timestamp} of the last instance seen ready
+_INSTANCE_CACHE = {}
+
+# Worker threads for HTTP probes that can run concurrently
+_PROBE_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+def _body(data):
+    """Serialize a Lambda response body to a JSON string"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
+def _json_bytes(data):
+    """Serialize a request payload straight to bytes for the HTTP body"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _fetch_gpu_status(instance_ip):
+    """GET /gpu-status, returning an error dict instead of raising"""
+    try:
+        gpu_url = GPU_STATUS_URL_TMPL % instance_ip
+        response = _get_session().get(gpu_url, timeout=(HTTP_CONNECT_TIMEOUT, GPU_STATUS_READ_TIMEOUT))
+
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"error": "GPU status check failed", "status_code": response.status_code}
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _ready_message_instance(body):
+    """Instance id from a ready message, unwrapping the SNS envelope if raw delivery is off"""
+    try:
+        envelope = json.loads(body)
+    except ValueError:
+        return body.strip()
+    if isinstance(envelope, dict):
+        return str(envelope.get('Message', '')).strip()
+    return body.strip()
+
+
+@lru_cache(maxsize=32)
+def _probe(instance_ip, timeout, check_gpu, bucket):
+    """
+    Probe /health, fetching /gpu-status concurrently when check_gpu is set.
+
+    Raises when the application is not healthy, so lru_cache only keeps
+    successful probes; bucket changes every HEALTH_CACHE_TTL seconds, which
+    expires cached results without an explicit TTL check.
+    """
+    # While the instance boots the port refuses connections; a bare connect fails
+    # fast there without building an HTTP request or waiting out the GET timeout
+    socket.create_connection((instance_ip, FASTAPI_PORT), timeout=TCP_PROBE_TIMEOUT).close()
+
+    # Fetch GPU status alongside /health so the success path costs one round trip
+    gpu_future = _PROBE_POOL.submit(_fetch_gpu_status, instance_ip) if check_gpu else None
+    health_url = HEALTH_URL_TMPL % instance_ip
+    response = _get_session().get(health_url, timeout=(HTTP_CONNECT_TIMEOUT, timeout))
+    if response.status_code != 200:
+        raise RuntimeError(f"unexpected status: {response.status_code}")
+    return response.json(), gpu_future.result() if gpu_future is not None else None
+
+
+def _forget_instance(instance_id):
+    """Drop the cached ready IP for an instance along with any health probes cached against it"""
+    _INSTANCE_CACHE.pop(instance_id, None)
+    # A probe cached for the old IP would otherwise keep vouching for it until its bucket expires
+    _probe.cache_clear()
+
+
+def _state_change(response, key):
+    """(current, previous) state names from a Start/StopInstances response, or (None, None)"""
+    changes = response.get(key) if response else None
+    if not changes:
+        return None, None
+    return changes[0]['CurrentState']['Name'], changes[0]['PreviousState']['Name']
+
+
+@lru_cache(maxsize=32)
+def _unknown_action_response(environment, action):
+    """Prebuilt 400 response for an unsupported action (bounded cache)"""
+    return {
+        'statusCode': 400,
+        'body': _body({'error': f'Unknown action: {action}', 'environment': environment})
+    }
+
+
+class InstanceController:
+    """
+    Start/stop an EC2 instance and drive the FastAPI application running on it.
+
+    One controller is created per Lambda entrypoint; the environment-specific
+    behaviour (instance type, timeouts, available actions) is passed in here.
+    """
+
+    def __init__(self, environment, instance_id, instance_type, default_action,
+                 actions, health_timeout, check_gpu=False,
+                 extra_payload=None, s3_bucket=None, uvicorn_workers=1):
+        self.environment = environment
+        self.label = environment.upper()
+        self.instance_id = instance_id
+        self.instance_type = instance_type
+        self.default_action = default_action
+        self.health_timeout = health_timeout
+        self.check_gpu = check_gpu
+        self.extra_payload = extra_payload or {}
+        self.s3_bucket = s3_bucket
+        self.uvicorn_workers = uvicorn_workers
+
+        # Action name -> bound method, restricted to the actions enabled for this environment
+        handlers = {
+            'start': self.start,
+            'stop': self.stop,
+            'start_and_process': self.start_and_process,
+            'deploy_and_start': self.deploy_and_start,
+            'scale_up': self.scale_up,
+            'scale_down': self.scale_down,
+        }
+        self._dispatch = {action: handlers[action] for action in actions}
+
+        # Messages and static responses are built once per container, not per invocation
+        self._started_message = f'Started {self.label} {instance_type} instance: {instance_id}'
+        self._stopped_message = f'Stopped {self.label} {instance_type} instance: {instance_id}'
+        self._ready_message = f'{self.label} {instance_type} instance started successfully'
+        self._deployed_message = f'{self.label} application deployed and started successfully'
+        self._start_failed_response = self._error(500, f'{self.label} instance failed to start')
+        self._not_accessible_response = self._error(
+            500, f'{self.label} instance failed to start or become accessible'
+        )
+        self._scale_down_response = {
+            'statusCode': 200,
+            'body': _body({
+                'message': 'Scale-down functionality not yet implemented',
+                'environment': environment,
+                'action': 'scale_down'
+            })
+        }
+
+    def handle(self, event, context):
+        """Lambda handler: dispatch on event['action']"""
+        try:
+            action = event.get('action', self.default_action)
+
+            logger.info("%s Environment - Processing action: %s", self.label, action)
+
+            if not isinstance(action, str):
+                # Unhashable or non-string actions can't hit the dispatch table or the response cache
+                return self._error(400, f'Unknown action: {action}')
+
+            handler = self._dispatch.get(action)
+            return handler(event, context) if handler else _unknown_action_response(self.environment, action)
+
+        except Exception as e:
+            logger.error("%s Lambda execution failed: %s", self.label, e)
+            return self._error(500, str(e))
+
+    def _error(self, status_code, message):
+        return {
+            'statusCode': status_code,
+            'body': _body({'error': message, 'environment': self.environment})
+        }
+
+    def start(self, event, context):
+        """Start the instance"""
+        try:
+            response = _get_ec2().start_instances(InstanceIds=[self.instance_id])
+            current_state, previous_state = _state_change(response, 'StartingInstances')
+            logger.info('Started %s %s instance: %s', self.label, self.instance_type, self.instance_id)
+
+            return {
+                'statusCode': 200,
+                'body': _body({
+                    'message': self._started_message,
+                    'instance_id': self.instance_id,
+                    'environment': self.environment,
+                    'instance_type': self.instance_type,
+                    'current_state': current_state,
+                    'previous_state': previous_state
+                })
+            }
+        except ClientError as e:
+            logger.error('Failed to start %s instance: %s', self.label, e)
+            return self._error(500, str(e))
+
+    def stop(self, event, context):
+        """Stop the instance"""
+        try:
+            # A stopped instance gets a new public IP when it next starts
+            _forget_instance(self.instance_id)
+            response = _get_ec2().stop_instances(InstanceIds=[self.instance_id])
+            current_state, previous_state = _state_change(response, 'StoppingInstances')
+            logger.info('Stopped %s %s instance: %s', self.label, self.instance_type, self.instance_id)
+
+            return {
+                'statusCode': 200,
+                'body': _body({
+                    'message': self._stopped_message,
+                    'instance_id': self.instance_id,
+                    'environment': self.environment,
+                    'instance_type': self.instance_type,
+                    'current_state': current_state,
+                    'previous_state': previous_state
+                })
+            }
+        except ClientError as e:
+            logger.error('Failed to stop %s instance: %s', self.label, e)
+            return self._error(500, str(e))
+
+    def start_and_process(self, event, context):
+        """Start the instance, wait for it to be ready, then trigger FastAPI processing"""
+        try:
+            # Start the instance
+            logger.info("Starting %s %s instance: %s", self.label, self.instance_type, self.instance_id)
+            # Import requests and build the HTTP session while StartInstances is in flight
+            start_future = _PROBE_POOL.submit(_get_ec2().start_instances, InstanceIds=[self.instance_id])
+            _get_session()
+            start_future.result()
+
+            # Wait for instance to be running and accessible
+            instance_ip = self.wait_for_instance_ready()
+            if not instance_ip:
+                return self._not_accessible_response
+
+            # Trigger FastAPI processing if payload provided
+            processing_result = None
+            if 'payload' in event:
+                processing_result = self.trigger_fastapi_processing(instance_ip, event['payload'])
+
+            return {
+                'statusCode': 200,
+                'body': _body({
+                    'message': self._ready_message,
+                    'instance_id': self.instance_id,
+                    'instance_ip': instance_ip,
+                    'environment': self.environment,
+                    'instance_type': self.instance_type,
+                    'job_id': processing_result.get('job_id') if processing_result else None,
+                    'processing_result': processing_result
+                })
+            }
+
+        except Exception as e:
+            if isinstance(e, ClientError):
+                _forget_instance(self.instance_id)
+            logger.error('Failed to start %s instance and process: %s', self.label, e)
+            return self._error(500, str(e))
+
+    def describe_instance(self):
+        """Fetch state and addressing for the instance in a single DescribeInstances call"""
+        response = _get_ec2().describe_instances(InstanceIds=[self.instance_id])
+        return response['Reservations'][0]['Instances'][0]
+
+    def wait_for_instance_ready(self):
+        """Wait for the EC2 instance to be running and accessible"""
+        # Warm invocations against an instance that is already up skip the EC2 round trips entirely
+        cached = _INSTANCE_CACHE.get(self.instance_id)
+        if cached:
+            if time.monotonic() - cached['ts'] < INSTANCE_CACHE_TTL and self.check_fastapi_health(cached['ip']):
+                logger.info("%s instance already ready at cached IP %s", self.label, cached['ip'])
+                return cached['ip']
+            _forget_instance(self.instance_id)
+
+        deadline = time.monotonic() + MAX_WAIT_TIME
+        # SQS SentTimestamp is epoch milliseconds; anything older is from a previous boot
+        started_ms = int(time.time() * 1000)
+
+        # Wait for instance to be running
+        logger.info("Waiting for %s instance to be in running state...", self.label)
+        instance = self.wait_until_running(deadline)
+        if instance is None:
+            return None
+
+        logger.info("%s instance is running, getting IP address...", self.label)
+        public_ip = instance.get('PublicIpAddress')
+        if not public_ip:
+            logger.error("%s instance has no public IP address", self.label)
+            return None
+        logger.info("%s instance public IP: %s", self.label, public_ip)
+
+        # An instance that was already running never publishes a new ready message; catch that first
+        if self.check_fastapi_health(public_ip):
+            _INSTANCE_CACHE[self.instance_id] = {'ip': public_ip, 'ts': time.monotonic()}
+            return public_ip
+
+        if CONFIG.ready_queue_url:
+            # The instance announces itself once /health is live. Short queue rounds are
+            # interleaved with probes so a silent notifier only costs one round, not the deadline
+            while time.monotonic() < deadline:
+                self.wait_for_ready_message(deadline, started_ms)
+                if self.check_fastapi_health(public_ip):
+                    _INSTANCE_CACHE[self.instance_id] = {'ip': public_ip, 'ts': time.monotonic()}
+                    return public_ip
+        elif self.wait_for_health(public_ip, deadline):
+            _INSTANCE_CACHE[self.instance_id] = {'ip': public_ip, 'ts': time.monotonic()}
+            return public_ip
+
+        logger.error("%s instance failed to become ready within timeout", self.label)
+        return None
+
+    def wait_for_health(self, instance_ip, deadline):
+        """Probe FastAPI with exponential backoff (1, 2, 4, 8, then every 10s) until healthy or the deadline passes"""
+        for attempt in range(HEALTH_CHECK_ATTEMPTS):
+            if self.check_fastapi_health(instance_ip):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(2 ** attempt, HEALTH_CHECK_MAX_DELAY, remaining))
+        return False
+
+    def wait_until_running(self, deadline):
+        """
+        Wait for the running state with the instance_running waiter, then describe the instance once.
+
+        The waiter does not expose its final DescribeInstances response, so the instance
+        is described again for the public IP. Returns None if the
+        instance fails, the deadline passes, or EC2 cannot be reached.
+        """
+        max_attempts = max(1, int((deadline - time.monotonic()) // WAITER_DELAY))
+        try:
+            _get_ec2().get_waiter('instance_running').wait(
+                InstanceIds=[self.instance_id],
+                WaiterConfig={'Delay': WAITER_DELAY, 'MaxAttempts': max_attempts}
+            )
+            return self.describe_instance()
+        except (BotoCoreError, ClientError) as e:
+            # WaiterError is a BotoCoreError; connection and read timeouts are caught here too
+            logger.error("%s instance failed to reach running state: %s", self.label, e)
+            return None
+
+    def wait_for_ready_message(self, deadline, started_ms):
+        """
+        Run one short receive on the ready queue; True once this instance has published its id.
+
+        Messages for other instances are made visible again straight away so their own
+        controllers see them. Queue errors are logged and waited out for the length of a
+        round, leaving the caller's /health probes to decide readiness.
+        """
+        sqs = _get_sqs()
+        queue_url = CONFIG.ready_queue_url
+        wait_seconds = max(1, min(READY_POLL_WAIT, int(deadline - time.monotonic())))
+        try:
+            response = sqs.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=wait_seconds,
+                AttributeNames=['SentTimestamp']
+            )
+            ready = False
+            for message in response.get('Messages', []):
+                if _ready_message_instance(message['Body']) != self.instance_id:
+                    sqs.change_message_visibility(
+                        QueueUrl=queue_url, ReceiptHandle=message['ReceiptHandle'], VisibilityTimeout=0
+                    )
+                    continue
+                sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=message['ReceiptHandle'])
+                if int(message['Attributes']['SentTimestamp']) >= started_ms:
+                    logger.info("%s instance reported ready via SQS", self.label)
+                    ready = True
+            return ready
+        except (BotoCoreError, ClientError) as e:
+            # Read timeouts and endpoint errors are BotoCoreErrors, not ClientErrors
+            logger.warning("%s ready queue polling failed: %s", self.label, e)
+            time.sleep(max(0, min(wait_seconds, deadline - time.monotonic())))
+            return False
+
+    def check_fastapi_health(self, instance_ip):
+        """Check if the FastAPI application is accessible on the instance"""
+        try:
+            result, gpu_status = _probe(
+                instance_ip, self.health_timeout, self.check_gpu,
+                int(time.monotonic() // HEALTH_CACHE_TTL)
+            )
+        except Exception as e:
+            logger.warning("%s FastAPI health check failed: %s", self.label, e)
+            return False
+
+        logger.info("%s FastAPI application is healthy: %s", self.label, result)
+        if self.check_gpu:
+            # Additional GPU health check
+            logger.info("%s GPU status: %s", self.label, gpu_status)
+        return True
+
+    def check_gpu_status(self, instance_ip):
+        """Check GPU status on the instance"""
+        return _fetch_gpu_status(instance_ip)
+
+    def trigger_fastapi_processing(self, instance_ip, payload):
+        """Trigger image processing on the FastAPI instance"""
+        try:
+            api_url = UPLOAD_URL_TMPL % instance_ip
+
+            # Add environment flag to payload
+            payload['environment'] = self.environment
+            payload['instance_type'] = self.instance_type
+            payload.update(self.extra_payload)
+
+            # If payload contains file paths or URLs, process them
+            if 'files' in payload:
+                # Handle file upload processing
+                response = _get_session().post(
+                    api_url,
+                    data=_json_bytes(payload),
+                    headers=JSON_HEADERS,
+                    timeout=(HTTP_CONNECT_TIMEOUT, PROCESSING_SUBMIT_TIMEOUT)
+                )
+
+                # 202: the instance accepted the job and returned its id; 200 from older app versions
+                if response.status_code in (200, 202):
+                    result = response.json()
+                    logger.info("%s processing accepted: %s", self.label, result)
+                    return result
+                else:
+                    logger.error("%s processing failed with status %s: %s", self.label, response.status_code, response.text)
+                    return {'error': f'{self.label} processing failed: {response.text}'}
+
+            return {'message': f'No files provided for {self.label} processing'}
+
+        except Exception as e:
+            logger.error("Failed to trigger %s FastAPI processing: %s", self.label, e)
+            return {'error': str(e)}
+
+    def deploy_and_start(self, event, context):
+        """Deploy code from S3 and start the FastAPI application on the instance"""
+        try:
+            # Start the instance
+            logger.info("Starting %s %s instance: %s", self.label, self.instance_type, self.instance_id)
+            # Build the SSM client while StartInstances is in flight; it is needed for the agent check
+            start_future = _PROBE_POOL.submit(_get_ec2().start_instances, InstanceIds=[self.instance_id])
+            _get_ssm()
+            start_future.result()
+            # Every stage below draws on the same budget so the action ends inside the Lambda timeout
+            deadline = time.monotonic() + DEPLOY_WAIT_TIME
+
+            # Wait for instance to be running and SSM ready
+            instance_ip = self.wait_for_instance_running(deadline)
+            if not instance_ip:
+                return self._start_failed_response
+
+            # Deploy application via SSM
+            deployment_result = self.deploy_application_via_ssm(deadline)
+            if deployment_result.get('status') != 'Success':
+                # A failed deploy will not bring FastAPI up; report it instead of polling /health
+                return {
+                    'statusCode': 500,
+                    'body': _body({
+                        'error': 'Application deployment failed',
+                        'instance_id': self.instance_id,
+                        'instance_ip': instance_ip,
+                        'environment': self.environment,
+                        'deployment_result': deployment_result
+                    })
+                }
+
+            # Poll FastAPI as soon as the deploy returns rather than sleeping a fixed interval
+            if self.wait_for_health(instance_ip, deadline):
+                return {
+                    'statusCode': 200,
+                    'body': _body({
+                        'message': self._deployed_message,
+                        'instance_id': self.instance_id,
+                        'instance_ip': instance_ip,
+                        'environment': self.environment,
+                        'instance_type': self.instance_type,
+                        'fastapi_url': DOCS_URL_TMPL % instance_ip,
+                        'deployment_result': deployment_result
+                    })
+                }
+            else:
+                return {
+                    'statusCode': 500,
+                    'body': _body({
+                        'error': 'Application deployed but FastAPI not responding',
+                        'instance_id': self.instance_id,
+                        'instance_ip': instance_ip,
+                        'environment': self.environment,
+                        'deployment_result': deployment_result
+                    })
+                }
+
+        except Exception as e:
+            logger.error('Failed to deploy and start %s application: %s', self.label, e)
+            return self._error(500, str(e))
+
+    def deploy_application_via_ssm(self, deadline):
+        """Deploy application code via SSM Run Command, waiting for it no later than `deadline`"""
+        try:
+            logger.info("Deploying %s application via SSM...", self.label)
+
+            # One bash script rather than a list of commands: a smaller SendCommand payload,
+            # and set -e stops the deploy at the first failing step
+            script = textwrap.dedent(f"""\
+                bash -s <<'DEPLOY'
+                set -euo pipefail
+                mkdir -p /home/ubuntu/divinepic-ec2-lambda
+                cd /home/ubuntu/divinepic-ec2-lambda
+                # Checksum of the deployed files; the upload refreshes every S3 timestamp, so sync output
+                # alone can't tell a real change from a re-upload. The log and bytecode are local-only
+                manifest() {{
+                    find . -type f ! -name fastapi.log ! -path '*/__pycache__/*' -print0 \\
+                        | sort -z | xargs -0 -r md5sum | md5sum
+                }}
+                before=$(manifest)
+                aws s3 sync s3://{self.s3_bucket}/app-files/{self.environment}/ . --region {REGION} \\
+                    --delete --no-progress --exclude 'fastapi.log' --exclude '*__pycache__/*'
+                if [ "$(manifest)" = "$before" ] && curl -sf --max-time 2 http://localhost:{FASTAPI_PORT}/health >/dev/null; then
+                    echo 'No changes and application healthy; skipping restart'
+                    exit 0
+                fi
+                # apt update alone takes ~20s; skip it when pip is already installed.
+                # stdin carries the rest of this script, so apt, dpkg and pip must not read from it
+                command -v pip3 >/dev/null || (
+                    sudo DEBIAN_FRONTEND=noninteractive apt-get update -q < /dev/null &&
+                    sudo DEBIAN_FRONTEND=noninteractive apt-get install -y -q python3-pip < /dev/null
+                )
+                pip3 install --disable-pip-version-check --no-input -r requirements.{self.environment}.txt < /dev/null
+                # Kill any existing FastAPI processes
+                pkill -f uvicorn || true
+                # Start FastAPI in background; stdin is the script itself, so detach it.
+                # uvloop and httptools ship with uvicorn[standard]; each worker loads its own model,
+                # so the count comes from the environment's profile rather than the CPU count
+                nohup python3 -m uvicorn app:app --host 0.0.0.0 --port {FASTAPI_PORT} \\
+                    --workers {self.uvicorn_workers} --loop uvloop --http httptools --log-level warning \\
+                    > fastapi.log 2>&1 < /dev/null &
+                sleep 5
+                echo 'Deployment completed'
+                DEPLOY
+                """)
+
+            # Execute commands via SSM
+            response = _get_ssm().send_command(
+                InstanceIds=[self.instance_id],
+                DocumentName="AWS-RunShellScript",
+                Parameters={'commands': [script]},
+                TimeoutSeconds=SSM_COMMAND_TIMEOUT
+            )
+
+            command_id = response['Command']['CommandId']
+            logger.info("SSM command executed with ID: %s", command_id)
+
+            # Wait for command to complete; the final poll already carries the output
+            output = self.wait_for_command(command_id, min(deadline, time.monotonic() + SSM_COMMAND_TIMEOUT))
+            if output is None:
+                logger.warning("Could not get SSM command output for %s", command_id)
+                return {'command_id': command_id, 'status': 'Unknown'}
+
+            if output['Status'] != 'Success':
+                logger.warning("SSM command did not complete successfully: %s", output['Status'])
+            logger.info("SSM command output: %s", output.get('StandardOutputContent', ''))
+            return {
+                'command_id': command_id,
+                'status': output['Status'],
+                'output': output.get('StandardOutputContent', ''),
+                'error': output.get('StandardErrorContent', '')
+            }
+
+        except Exception as e:
+            logger.error("Failed to deploy via SSM: %s", e)
+            return {'error': str(e)}
+
+    def wait_for_command(self, command_id, deadline):
+        """
+        Poll the command invocation with Fibonacci backoff (2, 3, 5, 8, 13, then every 15s).
+
+        Returns the invocation as soon as it reaches a terminal status, the last one
+        seen if the deadline passes first, or None if it was never visible.
+        """
+        ssm = _get_ssm()
+        delay, next_delay = 2, 3
+        invocation = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return invocation
+            time.sleep(min(delay, remaining))
+            try:
+                invocation = ssm.get_command_invocation(CommandId=command_id, InstanceId=self.instance_id)
+            except ClientError as e:
+                # InvocationDoesNotExist is expected for a moment right after send_command
+                logger.debug("SSM command invocation not available yet: %s", e)
+            except BotoCoreError as e:
+                # A dropped connection or read timeout; the command is still running, so keep polling it
+                logger.warning("SSM command status poll failed: %s", e)
+            else:
+                if invocation['Status'] in SSM_TERMINAL_STATUSES:
+                    return invocation
+            delay, next_delay = next_delay, min(delay + next_delay, SSM_POLL_MAX_DELAY)
+
+    def wait_for_instance_running(self, deadline):
+        """Wait until `deadline` for the EC2 instance to be running with its SSM agent online"""
+        logger.info("Waiting for %s instance to be in running state...", self.label)
+        instance = self.wait_until_running(deadline)
+        if instance is None:
+            return None
+
+        public_ip = instance.get('PublicIpAddress')
+        if not public_ip:
+            logger.error("%s instance has no public IP address", self.label)
+            return None
+        logger.info("%s instance public IP: %s", self.label, public_ip)
+
+        # The agent usually registers well before the EC2 status checks pass, so wait on it directly
+        logger.info("%s instance is running, waiting for SSM agent...", self.label)
+        # LaunchTime moves on every start but not for an instance that was already running,
+        # whose agent may not ping again for several minutes
+        if not self.wait_for_ssm_agent(deadline, instance['LaunchTime'].timestamp()):
+            logger.error("%s SSM agent did not come online within timeout", self.label)
+            return None
+        return public_ip
+
+    def wait_for_ssm_agent(self, deadline, launched):
+        """Poll SSM with exponential backoff until the agent has pinged since `launched` (epoch seconds)"""
+        ssm = _get_ssm()
+        attempt = 0
+        while True:
+            try:
+                response = ssm.describe_instance_information(
+                    Filters=[{'Key': 'InstanceIds', 'Values': [self.instance_id]}]
+                )
+                for info in response.get('InstanceInformationList', []):
+                    # A stale Online record from before the stop carries an older ping time
+                    if info.get('PingStatus') == 'Online' and info['LastPingDateTime'].timestamp() >= launched:
+                        logger.info("%s SSM agent is online", self.label)
+                        return True
+            except (BotoCoreError, ClientError) as e:
+                # Throttling, read timeouts and endpoint errors are retried on the next poll
+                logger.warning("%s SSM agent lookup failed: %s", self.label, e)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(2 ** attempt, HEALTH_CHECK_MAX_DELAY, remaining))
+            attempt += 1
+
+    def scale_up(self, event, context):
+        """Start additional instances for high load, batching every EC2 call across event['instance_ids']"""
+        instance_ids = event.get('instance_ids') or []
+        if not isinstance(instance_ids, list):
+            return self._error(400, 'instance_ids must be a list')
+        if not instance_ids:
+            return self._error(400, 'instance_ids is required for scale_up')
+
+        try:
+            logger.info("%s scale-up requested for %s instances", self.label, len(instance_ids))
+            ec2 = _get_ec2()
+            # One call each for start and tagging, rather than one per instance
+            ec2.start_instances(InstanceIds=instance_ids)
+            ec2.create_tags(Resources=instance_ids, Tags=[
+                {'Key': 'Environment', 'Value': self.environment},
+                {'Key': 'ScaledBy', 'Value': 'divinepic-controller'},
+            ])
+            ec2.get_waiter('instance_running').wait(
+                InstanceIds=instance_ids,
+                WaiterConfig={'Delay': WAITER_DELAY, 'MaxAttempts': MAX_WAIT_TIME // WAITER_DELAY}
+            )
+
+            return {
+                'statusCode': 200,
+                'body': _body({
+                    'message': f'Scaled up {len(instance_ids)} {self.label} instances',
+                    'instance_ids': instance_ids,
+                    'environment': self.environment,
+                    'action': 'scale_up'
+                })
+            }
+        except (WaiterError, ClientError) as e:
+            logger.error("Failed to scale up %s instances: %s", self.label, e)
+            return self._error(500, str(e))
+
+    def scale_down(self, event, context):
+        """Scale down instances after processing (future enhancement)"""
+        logger.info("%s scale-down requested", self.label)
+        # This would handle terminating additional instances
+        # For now, just return the prebuilt success response
+        return self._scale_down_response
@@ -0,0 +1,46 @@
+"""
+Bake the current configuration into a constants_frozen.py module.
+
+Deployment packages ship the generated module next to constants.py, so
+get_config() builds Config from literals instead of reading the
+environment. Values come from the environment and .env at build time;
+Lambda environment variables changed after deployment are not picked up.
+
+Usage: python scripts/gen_constants.py <output_path>
+
+The output must go into a package directory, never next to the source
+constants.py: get_config() would pick it up there and shadow .env for
+local runs.
+"""
+import dataclasses
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from constants import load_config_from_env  # noqa: E402
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python scripts/gen_constants.py <output_path>")
+    output_path = sys.argv[1]
+    if os.path.dirname(os.path.abspath(output_path)) == ROOT_DIR:
+        sys.exit(f"Refusing to write {output_path} next to constants.py; it would override .env locally")
+    values = dataclasses.asdict(load_config_from_env())
+
+    lines = [
+        "# Generated by scripts/gen_constants.py - do not edit",
+        "FROZEN_CONFIG = {",
+    ]
+    lines += [f"    {name!r}: {value!r}," for name, value in values.items()]
+    lines.append("}")
+
+    with open(output_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"Wrote frozen configuration to {output_path}")
+
+
+if __name__ == "__main__":
+    main()